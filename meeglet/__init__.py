@@ -3,12 +3,14 @@ __version__ = "0.0.1"
 
 # %% auto 0
 __all__ = ['define_frequencies', 'define_wavelets', 'compute_spectral_features_array', 'compute_spectral_features',
-           'spectrum_from_features', 'ro_corrcoef', 'bw2qt', 'qt2bw', 'plot_wavelet_family']
+           'compute_spectral_features_sweep', 'OnlineSpectralFeatures', 'spectrum_from_features', 'ro_corrcoef', 'ro_pinv',
+           'bw2qt', 'qt2bw', 'plot_wavelet_family']
 
 # %% ../nbs/api/wavelets.ipynb 2
 import warnings
 from types import SimpleNamespace
 from typing import Union, Optional
+from itertools import product
 from math import nan, sqrt, log, log2, pi, ceil
 import cmath
 import numpy as np
@@ -117,6 +119,7 @@ def _apply_wavlet(data, kernel, scaling, n_samp_eff, n_shift, allow_fraction_nan
     # memory allocation
     frac_nan = np.empty((data_conv.shape[1]))
     frac_nan[:] = np.nan
+    nan_width_max = frac_nan.copy()
 
     # handle nans
     nan_width = nan_width_init.copy()
@@ -132,6 +135,7 @@ def _apply_wavlet(data, kernel, scaling, n_samp_eff, n_shift, allow_fraction_nan
         nan_width_section = nan_width[i_section:i_section + n_samp_eff]
         n_nan = np.sum(np.isnan(section[0]))
         frac_nan[cnt] = n_nan / section.shape[1]
+        nan_width_max[cnt] = np.max(nan_width_section)
         allow_nan_limit = section.shape[1] * allow_fraction_nan
         if n_nan == 0:
             data_conv[:, cnt:cnt + 1] = (
@@ -159,9 +163,10 @@ def _apply_wavlet(data, kernel, scaling, n_samp_eff, n_shift, allow_fraction_nan
     n_valid = len(idx_valid)
     data_conv = data_conv[:, idx_valid]
     frac_nan = frac_nan[idx_valid]
+    nan_width_max = nan_width_max[idx_valid]
     out = None
     if n_valid > 0:
-        out = data_conv, n_valid, frac_nan
+        out = data_conv, n_valid, frac_nan, nan_width_max, idx_valid
 
     return out
 
@@ -208,133 +213,114 @@ def _prepare_output(data, foi, features):
     return out, info
 
 
-@verbose
-def _compute_spectral_features(data, wavelets, features, out, info,
-                               allow_fraction_nan, rank, verbose):
-    "Apply wavelet and compute spectral features."
-    logger.info(f'Computing convolutions for {len(wavelets)}'
-                f' wavelet{"s" if len(wavelets) > 1 else ""}'
-                f' and extracting features ...')
-    for i_foi, (kernel, scaling, n_samp_eff, n_shift) in enumerate(wavelets):
-        data_conv, n_valid, frac_nan = None, None, None
-        conv_ = _apply_wavlet(
-            data=data, kernel=kernel, n_samp_eff=n_samp_eff,
-            n_shift=n_shift, scaling=scaling,
-            allow_fraction_nan=allow_fraction_nan)
-        if conv_ is not None:
-            data_conv, n_valid, frac_nan = conv_
-        else:
-            logger.warning(f"Found no valid data at {info.foi[i_foi]} Hz.")
-            continue
+def _compute_features_from_conv(data_conv, n_valid, i_foi, features, out, rank):
+    "Compute spectral features at one frequency from wavelet-convolved data."
+    # power measures
+    if 'pow' in features:
+        pow = np.abs(data_conv) ** 2
+        out.pow[:, i_foi] = np.mean(pow, axis=1)
+        out.pow_median[:, i_foi] = np.median(pow, axis=1)
+        out.pow_geo[:, i_foi] = np.exp(np.mean(np.log(pow), axis=1))
+        out.pow_var[:, i_foi] = np.var(pow, axis=1, ddof=1)
 
-        # power measures
-        info.n_valid_total[i_foi] = n_valid
-        if 'pow' in features:
-            pow = np.abs(data_conv) ** 2
-            out.pow[:, i_foi] = np.mean(pow, axis=1)
-            out.pow_median[:, i_foi] = np.median(pow, axis=1)
-            out.pow_geo[:, i_foi] = np.exp(np.mean(np.log(pow), axis=1))
-            out.pow_var[:, i_foi] = np.var(pow, axis=1, ddof=1)
-
-        if any(k in features for k in ('csd', 'cov', 'cov_oas', 'coh', 'icoh', 'gim')):
-            out.csd[:, :, i_foi] = data_conv @ data_conv.conj().T  / n_valid
-
-        if 'cov' in features or 'cov_oas' in features:
-            out.cov[:, :, i_foi] = np.real(out.csd[:, :, i_foi])
-
-        if 'cov_oas' in features:
-            out.cov_oas[:, :, i_foi] = out.cov[:, :, i_foi]
-            # The following code is adapted from scikit-learn implementation of
-            # Oracle Approximating Shrinkage (OAS) for covariance regularization.
-            emp_cov = out.cov_oas[:, :, i_foi]
-            n_features = emp_cov.shape[0]
-            mu = np.trace(emp_cov) / n_features
-            # formula from Chen et al.'s **implementation**
-            alpha = np.mean(emp_cov ** 2)
-            num = alpha + mu ** 2
-
-            n_samples = n_valid  # use effective number of samples 
-
-            den = (n_samples + 1.0) * (alpha - (mu**2) / n_features)
-
-            shrinkage = 1.0 if den == 0 else min(num / den, 1.0)
-            shrunk_cov = (1.0 - shrinkage) * emp_cov
-            shrunk_cov.flat[:: n_features + 1] += shrinkage * mu
-            out.cov_oas[:, :, i_foi] = shrunk_cov
-
-        # coherence measures
-        if 'coh' in features or 'icoh' in features:
-            csd = out.csd
-            out.coh[:, :, i_foi] = (
-                csd[:, :, i_foi] /
-                np.sqrt(np.diag(csd[:, :, i_foi])[:, None] @ 
-                        np.diag(csd[:, :, i_foi])[None,:])
-            )
+    if any(k in features for k in ('csd', 'cov', 'cov_oas', 'coh', 'icoh', 'gim')):
+        out.csd[:, :, i_foi] = data_conv @ data_conv.conj().T  / n_valid
 
-        if 'icoh' in features:
-            out.icoh[:, :, i_foi] = out.coh[:, :, i_foi].imag
-
-        if 'gim' in features:
-            C = out.csd[:, :, i_foi]
-            if rank < C.shape[0]:
-                C_inv = ro_pinv(C.real, rank)
-            else:
-                C_inv = np.linalg.pinv(C.real)
-            out.gim[i_foi] = 1 / 2 * np.trace(
-                C_inv @ np.imag(C) @ C_inv @ np.imag(C).T
-            )
+    if 'cov' in features or 'cov_oas' in features:
+        out.cov[:, :, i_foi] = np.real(out.csd[:, :, i_foi])
+
+    if 'cov_oas' in features:
+        out.cov_oas[:, :, i_foi] = out.cov[:, :, i_foi]
+        # The following code is adapted from scikit-learn implementation of
+        # Oracle Approximating Shrinkage (OAS) for covariance regularization.
+        emp_cov = out.cov_oas[:, :, i_foi]
+        n_features = emp_cov.shape[0]
+        mu = np.trace(emp_cov) / n_features
+        # formula from Chen et al.'s **implementation**
+        alpha = np.mean(emp_cov ** 2)
+        num = alpha + mu ** 2
+
+        n_samples = n_valid  # use effective number of samples 
+
+        den = (n_samples + 1.0) * (alpha - (mu**2) / n_features)
+
+        shrinkage = 1.0 if den == 0 else min(num / den, 1.0)
+        shrunk_cov = (1.0 - shrinkage) * emp_cov
+        shrunk_cov.flat[:: n_features + 1] += shrinkage * mu
+        out.cov_oas[:, :, i_foi] = shrunk_cov
+
+    # coherence measures
+    if 'coh' in features or 'icoh' in features:
+        csd = out.csd
+        out.coh[:, :, i_foi] = (
+            csd[:, :, i_foi] /
+            np.sqrt(np.diag(csd[:, :, i_foi])[:, None] @ 
+                    np.diag(csd[:, :, i_foi])[None,:])
+        )
+
+    if 'icoh' in features:
+        out.icoh[:, :, i_foi] = out.coh[:, :, i_foi].imag
 
-        # phase measures
-        if 'plv' in features:
-            data_n = data_conv / np.abs(data_conv)
-            out.plv[:, :, i_foi] = data_n @ data_n.conj().T / n_valid
-
-        if 'pli' in features:
-            n_sens = data.shape[0]
-            data_n = data_conv / np.abs(data_conv)
-            for i_idx in range(n_sens):
-                for j_idx in range(i_idx + 1, n_sens, 1):
-                    out.pli[i_idx, j_idx, i_foi] = np.mean(
-                        np.sign(np.imag(data_n[i_idx] * data_n[j_idx].conj()))
-                    )
-            out.pli[:, :, i_foi] = out.pli[:, :, i_foi] + out.pli[:, :, i_foi].T
-
-        if 'dwpli' in features:
-            n_sens = data.shape[0]
-            for i_idx in range(n_sens):
-                for j_idx in range(i_idx + 1, n_sens, 1):
-                    cdi = np.imag(data_conv[i_idx] * np.conj(data_conv[j_idx]))
-                    imag_sum = np.sum(cdi)
-                    imag_sum_w = np.sum(np.abs(cdi))
-                    debias_factor = np.sum(cdi ** 2)
-                    out.dwpli[i_idx, j_idx, i_foi]  = (
-                        (imag_sum ** 2 - debias_factor) /
-                        (imag_sum_w ** 2 - debias_factor)
-                    )
-            out.dwpli[:, :, i_foi] = out.dwpli[:, :, i_foi] + out.dwpli[:, :, i_foi].T
-
-        # envelope correlation measures
-        if any(ft in features for ft in ('r_plain', 'r_orth')):
-            for i_sens in range(data.shape[0]):
-                seed = data_conv[i_sens]
-                seed_logpow = np.log(seed * seed.conj())
-                src = data_conv
-                src_logpow = np.log(src * src.conj())
-                if any('orth' in ft for ft in features):
-                    seed_abs = (seed / np.abs(seed))[np.newaxis]
-                    src_orth = np.imag(data_conv * np.conj(seed_abs)) * cmath.sqrt(-1) * seed_abs
-                    src_logpow_orth = np.log(src_orth * np.conj(src_orth))
-                if 'r_plain' in features:
-                    r_plain = ro_corrcoef(seed_logpow[np.newaxis], src_logpow, 2)
-                    out.r_plain[i_sens, :, i_foi] = r_plain.r.real
-                if 'r_orth' in features:
-                    r_orth = ro_corrcoef(seed_logpow[np.newaxis], src_logpow_orth, 2)
-                    out.r_orth[i_sens, :, i_foi] = r_orth.r.real
-                    # make sure we have nans on diag as in Matlab
+    if 'gim' in features:
+        C = out.csd[:, :, i_foi]
+        if rank < C.shape[0]:
+            C_inv = ro_pinv(C.real, rank)
         else:
-            # implement other options here in the future
-            pass
-    logger.info('done')
+            C_inv = np.linalg.pinv(C.real)
+        out.gim[i_foi] = 1 / 2 * np.trace(
+            C_inv @ np.imag(C) @ C_inv @ np.imag(C).T
+        )
+
+    # phase measures
+    if 'plv' in features:
+        data_n = data_conv / np.abs(data_conv)
+        out.plv[:, :, i_foi] = data_n @ data_n.conj().T / n_valid
+
+    if 'pli' in features:
+        n_sens = data_conv.shape[0]
+        data_n = data_conv / np.abs(data_conv)
+        for i_idx in range(n_sens):
+            for j_idx in range(i_idx + 1, n_sens, 1):
+                out.pli[i_idx, j_idx, i_foi] = np.mean(
+                    np.sign(np.imag(data_n[i_idx] * data_n[j_idx].conj()))
+                )
+        out.pli[:, :, i_foi] = out.pli[:, :, i_foi] + out.pli[:, :, i_foi].T
+
+    if 'dwpli' in features:
+        n_sens = data_conv.shape[0]
+        for i_idx in range(n_sens):
+            for j_idx in range(i_idx + 1, n_sens, 1):
+                cdi = np.imag(data_conv[i_idx] * np.conj(data_conv[j_idx]))
+                imag_sum = np.sum(cdi)
+                imag_sum_w = np.sum(np.abs(cdi))
+                debias_factor = np.sum(cdi ** 2)
+                out.dwpli[i_idx, j_idx, i_foi]  = (
+                    (imag_sum ** 2 - debias_factor) /
+                    (imag_sum_w ** 2 - debias_factor)
+                )
+        out.dwpli[:, :, i_foi] = out.dwpli[:, :, i_foi] + out.dwpli[:, :, i_foi].T
+
+    # envelope correlation measures
+    if any(ft in features for ft in ('r_plain', 'r_orth')):
+        for i_sens in range(data_conv.shape[0]):
+            seed = data_conv[i_sens]
+            seed_logpow = np.log(seed * seed.conj())
+            src = data_conv
+            src_logpow = np.log(src * src.conj())
+            if any('orth' in ft for ft in features):
+                seed_abs = (seed / np.abs(seed))[np.newaxis]
+                src_orth = np.imag(data_conv * np.conj(seed_abs)) * cmath.sqrt(-1) * seed_abs
+                src_logpow_orth = np.log(src_orth * np.conj(src_orth))
+            if 'r_plain' in features:
+                r_plain = ro_corrcoef(seed_logpow[np.newaxis], src_logpow, 2)
+                out.r_plain[i_sens, :, i_foi] = r_plain.r.real
+            if 'r_orth' in features:
+                r_orth = ro_corrcoef(seed_logpow[np.newaxis], src_logpow_orth, 2)
+                out.r_orth[i_sens, :, i_foi] = r_orth.r.real
+                # make sure we have nans on diag as in Matlab
+    else:
+        # implement other options here in the future
+        pass
 
 
 def _prepand_nan_epochs(data):
@@ -387,33 +373,15 @@ def compute_spectral_features_array(
                                              # and `info` outputs with `.foi` and `.n_valid_total` attributes.
     # Compute spectral features from complex Morlet Wavelet transform.
 
-    logger.info('Initializing Wavelets ...')
-    foi, sigma_time, *_, bw_oct, qt, = define_frequencies(
-        foi_start=foi_start, foi_end=foi_end, delta_oct=delta_oct,
-        bw_oct=bw_oct, qt=qt, freq_shift_factor=freq_shift_factor)
-
-    wavelets = define_wavelets(
-        foi=foi, sigma_time=sigma_time, kernel_width=kernel_width,
-        sfreq=sfreq, window_shift=window_shift, density=density)
-    logger.info('done')
-
-    if freq_shift_factor != 1:
-        foi /= freq_shift_factor
-
-    out, info = _prepare_output(data, foi=foi, features=features)
-    info.bw_oct = bw_oct
-    info.qt = qt
-
-    if rank is None:
-        rank_ = data.shape[0]
-    else:
-        rank_ = rank
-
-    _compute_spectral_features(data=data, wavelets=wavelets,
-                               features=features, out=out, info=info,
-                               allow_fraction_nan=allow_fraction_nan,
-                               rank=rank_,
-                               verbose=verbose)
+    (out, info), = compute_spectral_features_sweep(
+        data=data, sfreq=sfreq, delta_oct=delta_oct, bw_oct=bw_oct, qt=qt,
+        foi_start=foi_start, foi_end=foi_end, window_shift=window_shift,
+        kernel_width=kernel_width, freq_shift_factor=freq_shift_factor,
+        density=density,
+        grid=[dict(features=features, rank=rank,
+                   allow_fraction_nan=allow_fraction_nan)],
+        verbose=verbose
+    )
     return out, info
 
 
@@ -493,6 +461,257 @@ def compute_spectral_features(
     return out, info
 
 # %% ../nbs/api/wavelets.ipynb 9
+@verbose
+def compute_spectral_features_sweep(
+        data: np.ndarray, # The continously sampled input data (may contain NaNs),
+                          # shape (n_channels, n_samples))
+        sfreq: float, # The sampling frequency in Hz.
+        grid: Union[list, dict], # The settings to sweep over. Either a list of dicts or a dict of lists expanded
+                                 # to all combinations in the order of `itertools.product`, i.e. the last key
+                                 # varies fastest. Keys are 'features', 'rank' and 'allow_fraction_nan', missing
+                                 # keys take the defaults of `compute_spectral_features_array`.
+        delta_oct: Union[float, None]=None, #  Controls the frequency resolution. If None, defaults
+                                    # to bw_oct / 4. If 1, spacing between frequencies of interesrt will be 1 octave,
+                                    # e.g. for foi_start=2 and foi_end=32 foi will be (2, 4, 8, 16, 32).
+        bw_oct: float=0.5, # The bandwidth of the Wavelets in octaves. Larger band width lead to more smoothing.
+        qt: Union[float, None]=None, # The bandwidth of the Wavelets expressed in characteristic Morlet parameter Q (overriding bw_oct).
+        foi_start: float=2, # The lowest frequency of interest.
+        foi_end: float=32, # The highest frequency of interest. 
+        window_shift: float=0.25, # Controls the spacing of the sliding windows proportionally to the
+                                  # length (seconds) of the wavelet kernel. Depends on the frequency of
+                                   #interest. Values smaller than 1 lead to overlapping sliding windows.
+        kernel_width: int=5, # The width of the kernel in standard deviations, leading to truncation.
+        freq_shift_factor: int=1, # Allows shifting the frequency spectrum in logarithmic space (in octave units).
+        density: str='oct', # Scaling of the power spectrum in Hz or per octave ('oct'). Defaults to 'oct'.
+                            # Note that this scaling is defined at the level of Wavelet kernels, hence,
+                            # applies to all derived quantities.
+        verbose: Union[bool, int, str]=False # `mne.verbose` for details. Should only be passed as a keyword argument.
+    ) -> list: # The `features` and `info` outputs of `compute_spectral_features_array` for each setting, ordered as the grid.
+               # The resolved setting is attached as `info.setting`.
+    # Compute spectral features for a grid of settings from shared Morlet Wavelet convolutions.
+    if isinstance(grid, dict):
+        grid = [dict(zip(grid, values)) for values in product(*grid.values())]
+    settings = list()
+    for params in grid:
+        unknown = sorted(set(params) - {'features', 'rank', 'allow_fraction_nan'})
+        if unknown:
+            raise ValueError('Only features, rank and allow_fraction_nan can be swept, '
+                             f'got {", ".join(unknown)}.')
+        setting = dict(features=('pow',), rank=None, allow_fraction_nan=0)
+        setting.update(params)
+        if setting['rank'] is None:
+            setting['rank'] = data.shape[0]
+        settings.append(setting)
+    if not settings:
+        raise ValueError('The grid must contain at least one setting.')
+
+    logger.info('Initializing Wavelets ...')
+    foi, sigma_time, *_, bw_oct, qt, = define_frequencies(
+        foi_start=foi_start, foi_end=foi_end, delta_oct=delta_oct,
+        bw_oct=bw_oct, qt=qt, freq_shift_factor=freq_shift_factor)
+
+    wavelets = define_wavelets(
+        foi=foi, sigma_time=sigma_time, kernel_width=kernel_width,
+        sfreq=sfreq, window_shift=window_shift, density=density)
+    logger.info('done')
+
+    if freq_shift_factor != 1:
+        foi /= freq_shift_factor
+
+    results = list()
+    for setting in settings:
+        out, info = _prepare_output(data, foi=foi, features=setting['features'])
+        info.bw_oct = bw_oct
+        info.qt = qt
+        info.setting = setting
+        results.append((out, info))
+
+    max_fraction_nan = max(setting['allow_fraction_nan'] for setting in settings)
+    logger.info(f'Computing convolutions for {len(wavelets)}'
+                f' wavelet{"s" if len(wavelets) > 1 else ""}'
+                f' and extracting features for {len(settings)}'
+                f' setting{"s" if len(settings) > 1 else ""} ...')
+    for i_foi, (kernel, scaling, n_samp_eff, n_shift) in enumerate(wavelets):
+        conv_ = _apply_wavlet(
+            data=data, kernel=kernel, n_samp_eff=n_samp_eff,
+            n_shift=n_shift, scaling=scaling,
+            allow_fraction_nan=max_fraction_nan)
+        if conv_ is None:
+            logger.warning(f"Found no valid data at {foi[i_foi]} Hz.")
+            continue
+        data_conv, _, frac_nan, nan_width_max, _ = conv_
+        n_nan = np.rint(frac_nan * n_samp_eff)
+
+        for setting, (out, info) in zip(settings, results):
+            # same NaN limits as in `_apply_wavlet`
+            allow_nan_limit = n_samp_eff * setting['allow_fraction_nan']
+            idx_valid = np.where(
+                (n_nan == 0) |
+                ((n_nan < allow_nan_limit) & (nan_width_max < allow_nan_limit))
+            )[0]
+            n_valid = len(idx_valid)
+            if n_valid == 0:
+                logger.warning(f"Found no valid data at {foi[i_foi]} Hz.")
+                continue
+            info.n_valid_total[i_foi] = n_valid
+            _compute_features_from_conv(
+                data_conv=data_conv[:, idx_valid], n_valid=n_valid, i_foi=i_foi,
+                features=setting['features'], out=out, rank=setting['rank'])
+    logger.info('done')
+    return results
+
+# %% ../nbs/api/wavelets.ipynb 11
+class OnlineSpectralFeatures:
+    "Incrementally update spectral features from a stream of samples, rejecting windows with NaNs in any channel."
+    def __init__(
+            self,
+            n_channels: int, # The number of channels of the sample stream.
+            sfreq: float, # The sampling frequency in Hz.
+            delta_oct: Union[float, None]=None, #  Controls the frequency resolution. If None, defaults
+                                        # to bw_oct / 4. If 1, spacing between frequencies of interesrt will be 1 octave,
+                                        # e.g. for foi_start=2 and foi_end=32 foi will be (2, 4, 8, 16, 32).
+            bw_oct: float=0.5, # The bandwidth of the Wavelets in octaves. Larger band width lead to more smoothing.
+            qt: Union[float, None]=None, # The bandwidth of the Wavelets expressed in characteristic Morlet parameter Q (overriding bw_oct).
+            foi_start: float=2, # The lowest frequency of interest.
+            foi_end: float=32, # The highest frequency of interest. 
+            window_shift: float=0.25, # Controls the spacing of the sliding windows proportionally to the
+                                      # length (seconds) of the wavelet kernel. Depends on the frequency of
+                                       #interest. Values smaller than 1 lead to overlapping sliding windows.
+            kernel_width: int=5, # The width of the kernel in standard deviations, leading to truncation.
+            freq_shift_factor: int=1, # Allows shifting the frequency spectrum in logarithmic space (in octave units).
+            features: Union[tuple, list]=('pow',), # The spectral featueres to be updated ('pow', 'csd', 'cov', 'coh', 'icoh').
+            density: str='oct', # Scaling of the power spectrum in Hz or per octave ('oct'). Defaults to 'oct'.
+            halflife: Union[float, None]=None, # The half-life in seconds of exponentially weighted estimates.
+                                               # If None, estimates are cumulative over all samples seen so far.
+        ):
+        not_implemented = [ft for ft in features
+                           if ft not in ('pow', 'csd', 'cov', 'coh', 'icoh')]
+        if not_implemented:
+            raise NotImplementedError(
+                f'{", ".join(not_implemented)} not implemented for online estimation.')
+        if halflife is not None and halflife <= 0:
+            raise ValueError(f'halflife must be positive, got {halflife}.')
+
+        foi, sigma_time, *_, bw_oct, qt, = define_frequencies(
+            foi_start=foi_start, foi_end=foi_end, delta_oct=delta_oct,
+            bw_oct=bw_oct, qt=qt, freq_shift_factor=freq_shift_factor)
+        self.wavelets = define_wavelets(
+            foi=foi, sigma_time=sigma_time, kernel_width=kernel_width,
+            sfreq=sfreq, window_shift=window_shift, density=density)
+        if freq_shift_factor != 1:
+            foi /= freq_shift_factor
+
+        self.features = features
+        self.info = SimpleNamespace(foi=foi, bw_oct=bw_oct, qt=qt)
+        # per-window decay factors, windows of each frequency advance by n_shift samples
+        n_shifts = np.array([n_shift for *_, n_shift in self.wavelets])
+        if halflife is None:
+            self._decay = np.ones(len(foi))
+        else:
+            self._decay = 2 ** (-n_shifts / (halflife * sfreq))
+
+        # new samples are pushed in chunks of at most the longest kernel, such that
+        # the ring buffer always holds all pending windows of every frequency
+        self._chunk_size = max(n_samp_eff for _, _, n_samp_eff, _ in self.wavelets)
+        self._buffer = np.empty((n_channels, 2 * self._chunk_size), dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        "Discard the buffered samples and the feature estimates."
+        n_sens, n_foi = self._buffer.shape[0], len(self.info.foi)
+        self._buffer[:] = np.nan
+        self.n_samples = 0
+        self._next_start = np.zeros(n_foi, dtype=np.int64)
+        self._n_valid = np.zeros(n_foi, dtype=np.int64)
+        self._weight = np.zeros(n_foi, dtype=np.float64)
+        self._sum_pow = np.zeros((n_sens, n_foi), dtype=np.float64)
+        self._sum_csd = None
+        if any(k in self.features for k in ('csd', 'cov', 'coh', 'icoh')):
+            self._sum_csd = np.zeros((n_sens, n_sens, n_foi), dtype=np.complex128)
+        return self
+
+    def update(
+            self,
+            samples: np.ndarray, # The newly arrived samples (may contain NaNs),
+                                 # shape (n_channels, n_samples)
+        ):
+        "Append samples to the ring buffer and update the features from newly completed windows."
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.ndim != 2 or samples.shape[0] != self._buffer.shape[0]:
+            raise ValueError(f'Samples must be of shape ({self._buffer.shape[0]}, n_samples), '
+                             f'got {samples.shape}.')
+        for i_chunk in range(0, samples.shape[1], self._chunk_size):
+            self._push(samples[:, i_chunk:i_chunk + self._chunk_size])
+        return self
+
+    def _push(self, chunk):
+        "Write a chunk to the ring buffer and convolve the completed windows."
+        n_buffer = self._buffer.shape[1]
+        self._buffer[:, np.arange(self.n_samples, self.n_samples + chunk.shape[1]) % n_buffer] = chunk
+        self.n_samples += chunk.shape[1]
+
+        for i_foi, (kernel, scaling, n_samp_eff, n_shift) in enumerate(self.wavelets):
+            start = self._next_start[i_foi]
+            n_windows = (self.n_samples - n_samp_eff - start) // n_shift + 1
+            if n_windows <= 0:
+                continue
+            stop = start + (n_windows - 1) * n_shift + n_samp_eff
+            section = self._buffer[:, np.arange(start, stop) % n_buffer]
+            self._next_start[i_foi] = start + n_windows * n_shift
+
+            # windows rejected due to NaNs also advance the decay
+            decay = self._decay[i_foi] ** n_windows
+            self._weight[i_foi] *= decay
+            self._sum_pow[:, i_foi] *= decay
+            if self._sum_csd is not None:
+                self._sum_csd[:, :, i_foi] *= decay
+
+            conv_ = _apply_wavlet(
+                data=section, kernel=kernel, n_samp_eff=n_samp_eff,
+                n_shift=n_shift, scaling=scaling,
+                allow_fraction_nan=0)
+            if conv_ is None:
+                continue
+            data_conv, *_, idx_valid = conv_
+            # `_apply_wavlet` only checks the first channel for NaNs
+            is_finite = np.isfinite(data_conv).all(axis=0)
+            data_conv, idx_valid = data_conv[:, is_finite], idx_valid[is_finite]
+            n_valid = len(idx_valid)
+            if n_valid == 0:
+                continue
+            # weight by the position of each valid window among all completed windows
+            weights = self._decay[i_foi] ** (n_windows - 1 - idx_valid)
+            self._n_valid[i_foi] += n_valid
+            self._weight[i_foi] += np.sum(weights)
+            self._sum_pow[:, i_foi] += np.abs(data_conv) ** 2 @ weights
+            if self._sum_csd is not None:
+                self._sum_csd[:, :, i_foi] += (data_conv * weights) @ data_conv.conj().T
+
+    def get_features(
+            self
+        ) -> (SimpleNamespace, SimpleNamespace): # The `features` with, e.g., `.pow`, `.coh` as attributes
+                                                 # and `info` outputs with `.foi` and `.n_valid_total` attributes.
+        "Return the current feature estimates, NaN at frequencies without valid windows."
+        weight = np.where(self._weight > 0, self._weight, np.nan)
+        out = SimpleNamespace()
+        if 'pow' in self.features:
+            out.pow = self._sum_pow / weight
+        if self._sum_csd is not None:
+            out.csd = self._sum_csd / weight
+        if 'cov' in self.features:
+            out.cov = np.real(out.csd)
+        if 'coh' in self.features or 'icoh' in self.features:
+            csd_diag = np.real(np.diagonal(out.csd)).T
+            out.coh = out.csd / np.sqrt(csd_diag[:, None] * csd_diag[None, :])
+        if 'icoh' in self.features:
+            out.icoh = out.coh.imag
+
+        info = SimpleNamespace(**vars(self.info))
+        info.n_valid_total = self._n_valid.copy()
+        info.n_samples = self.n_samples
+        return out, info
+
+# %% ../nbs/api/wavelets.ipynb 13
 def spectrum_from_features(
         data: np.ndarray,  # spectral features, e.g. power, shape(n_channels, n_frequencies)
         freqs: np.ndarray, # frequencies, shape(n_frequencies)
@@ -516,7 +735,7 @@ def spectrum_from_features(
     )
     return mne.time_frequency.Spectrum(state, **defaults)
 
-# %% ../nbs/api/wavelets.ipynb 11
+# %% ../nbs/api/wavelets.ipynb 15
 def ro_corrcoef(
         x: np.ndarray, # the seed (assuming time samples on last axis)
         y: np.ndarray, # the targets (assuming time samples on last axis)
@@ -544,7 +763,23 @@ def ro_corrcoef(
     return out
 
 
-# %% ../nbs/api/wavelets.ipynb 14
+# %% ../nbs/api/wavelets.ipynb 16
+from scipy.linalg import svd
+
+def ro_pinv(
+        A: np.ndarray,  # 2d matrix
+        r: Union[int, None]=None,  # numeric rank
+    ) -> np.ndarray:  # the pseudoinverse of A
+    if r is None:
+        r = A.shape[0]
+    U, s, Vt = svd(A, full_matrices=False)
+
+    s_inv = np.diag(1 / s[:r])
+
+    X = Vt.T[:, :r] @ s_inv @ U[:, :r].T
+    return X
+
+# %% ../nbs/api/wavelets.ipynb 18
 def bw2qt(
         bw: float, # the Wavelet's bandwidth
     ) -> float:  # characteristic Morlet parameter
@@ -557,7 +792,7 @@ def bw2qt(
 
 assert round(bw2qt(0.5), 1) == 6.9
 
-# %% ../nbs/api/wavelets.ipynb 15
+# %% ../nbs/api/wavelets.ipynb 19
 def qt2bw(
         qt: float, # characteristic Morlet parameter
     ) -> float:  # the Wavelet's bandwidth
@@ -571,7 +806,7 @@ def qt2bw(
 
 assert round(qt2bw(6.9), 1) == 0.5
 
-# %% ../nbs/api/wavelets.ipynb 17
+# %% ../nbs/api/wavelets.ipynb 21
 def plot_wavelet_family(
         wavelets: list, # List of wavelets and associated parameters.
         foi: np.ndarray, # Frequencies of interest.